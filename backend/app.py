@@ -1,28 +1,131 @@
 from __future__ import annotations
 
+import asyncio
+import hmac
 import json
 import os
+import queue
+import re
+import secrets
 import sqlite3
+import threading
 import unicodedata
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
 import bcrypt
-from litestar import Litestar, get, post
+import msgspec
+import orjson
+from cachetools import TTLCache
+from itsdangerous import BadSignature, TimestampSigner
+from litestar import Litestar, MediaType, get, post
 from litestar.connection import Request
 from litestar.exceptions import HTTPException
 from litestar.response import Response
+from litestar.serialization import default_serializer
 from litestar.static_files import create_static_files_router
+from redis.asyncio import ConnectionPool, Redis
 
 
 # Paths robustos (no dependen del working directory)
 BASE_DIR = Path(__file__).resolve().parent
 PROJECT_DIR = BASE_DIR.parent
 
-DB_PATH = PROJECT_DIR / "prueba.db"
+# DB_PATH se puede cambiar por variable de entorno (los tests usan una base temporal)
+DB_PATH = Path(os.getenv("DB_PATH") or PROJECT_DIR / "prueba.db")
 DATA_PATH = PROJECT_DIR / "data" / "usuarios.json"
 FRONTEND_DIR = PROJECT_DIR / "frontend"
 
+# Costo de bcrypt para los hashes generados (seed y re-hash). En produccion 12; en tests/dev
+# se puede bajar (minimo 4) con BCRYPT_COST para que cada login/seed no cueste ~250 ms.
+# Los hashes guardados con un costo menor se re-generan en el siguiente login exitoso
+# (nunca se baja el costo de un hash existente).
+BCRYPT_COST = int(os.getenv("BCRYPT_COST", "12"))
+
+# Hilos dedicados a bcrypt.checkpw: bcrypt libera el GIL, asi varios logins concurrentes
+# se verifican en paralelo sin bloquear el event loop.
+_BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+# Cache en memoria de logins verificados (evita repetir bcrypt.checkpw, ~250 ms por llamada).
+# La clave es (username, HMAC-SHA256(username:password)): la clave en texto plano nunca se guarda.
+# Si AUTH_CACHE_SECRET no esta definido se genera uno aleatorio por proceso.
+# _AUTH_CACHE_KEYS indexa las claves por user_id para invalidar un usuario en O(1).
+AUTH_CACHE_SECRET = os.getenv("AUTH_CACHE_SECRET", "").encode("utf-8") or secrets.token_bytes(32)
+AUTH_CACHE_TTL = 300
+_AUTH_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+_AUTH_CACHE_KEYS: dict[int, set[tuple[str, bytes]]] = {}
+_AUTH_CACHE_LOCK = threading.Lock()
+
+# Pool de conexiones SQLite reutilizables (evita abrir/cerrar el archivo en cada request).
+POOL_SIZE = min(32, (os.cpu_count() or 1) * 4)
+_POOL: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=POOL_SIZE)
+
+# SQL de lectura como constantes: el texto identico reutiliza el statement compilado
+# de cada conexion del pool (cached_statements).
+_SQL_GET_USER_AUTH = "SELECT id, nombre, rol, renta_mensual, username, password_hash FROM usuarios WHERE username = ?"
+_SQL_GET_USERS_ALL = "SELECT id, nombre, rol, renta_mensual FROM usuarios"
+_SQL_UPDATE_PASSWORD_HASH = "UPDATE usuarios SET password_hash = ? WHERE id = ?"
+
+# Cualquier secuencia de caracteres fuera de [a-z0-9] se colapsa en un "_" (ver _slugify)
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+# Snapshot en memoria de la tabla usuarios (sin credenciales) para servir GET /usuarios sin I/O.
+# Es una tupla (usuarios por rol, usuario por id) que se reemplaza completa al recargar;
+# las listas/dicts se comparten entre requests y no deben modificarse.
+_USERS_SNAPSHOT: tuple[dict[str, list[dict[str, Any]]], dict[int, dict[str, Any]]] | None = None
+_USERS_SNAPSHOT_LOCK = threading.Lock()
+
+# Reglas de visibilidad precalculadas: rol -> roles que puede ver (None = todos).
+# "usuario" no esta aqui porque solo se ve a si mismo; cualquier otro rol no ve nada.
+_VISIBLE_ROLES: dict[str, frozenset[str] | None] = {
+    "admin": None,
+    "supervisor": frozenset({"supervisor", "usuario"}),
+}
+
+# Redis opcional (solo si REDIS_URL esta definido), usado para las sesiones.
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Sesiones: la cookie "sid" lleva "<user_id>:<rol>:<token opaco>" firmado con TimestampSigner,
+# asi el rol se puede leer de la cookie sin que el cliente pueda falsificarlo.
+# La sesion ademas existe en Redis (o, sin REDIS_URL, en memoria del proceso) para poder revocarla.
+# Claves namespaced por usuario: sess:<user_id>:<token>, mas el set user_sessions:<user_id>
+# con los tokens activos. Asi invalidar un usuario borra solo sus claves.
+# Importante: ningun codigo debe usar FLUSHDB/FLUSHALL (vaciaria sesiones y caches de todos).
+#
+# SESSION_SECRET admite varias claves separadas por coma para rotarlas: se firma con la ultima
+# y se aceptan todas. Si no esta definido se genera una clave aleatoria por proceso
+# (con varios workers hay que definirlo).
+SESSION_COOKIE = "sid"
+SESSION_TTL = 3600
+SESSION_SECRET = [key for key in os.getenv("SESSION_SECRET", "").split(",") if key] or [secrets.token_hex(32)]
+COOKIE_SECURE = os.getenv("COOKIE_SECURE") == "1"
+_SESSION_SIGNER = TimestampSigner(SESSION_SECRET)
+_LOCAL_SESSIONS: TTLCache = TTLCache(maxsize=100_000, ttl=SESSION_TTL)
+_LOCAL_USER_SESSIONS: dict[int, set[str]] = {}
+_LOCAL_SESSIONS_LOCK = threading.Lock()
+
+
+class LoginDTO(msgspec.Struct):
+    """Body de POST /auth/login. Litestar lo decodifica y valida con msgspec."""
+
+    username: str
+    password: str
+
+    def __post_init__(self) -> None:
+        self.username = self.username.strip()
+
+
+class ORJSONResponse(Response):
+    """Response que serializa JSON con orjson (mas rapido para listas de dicts como /usuarios)."""
+
+    def render(self, content: Any, media_type: str, enc_hook: Any = default_serializer) -> bytes:
+        if media_type == MediaType.JSON and not isinstance(content, (bytes, str)):
+            return orjson.dumps(content, default=enc_hook)
+        return super().render(content, media_type, enc_hook)
+
 
 def _slugify(text: str) -> str:
     """Normaliza un nombre para generar un username base.
@@ -33,15 +136,79 @@ def _slugify(text: str) -> str:
     Reglas:
     - Quita diacriticos (tildes)
     - Pasa a minusculas
-    - Reemplaza espacios por "_"
-    - Mantiene solo [a-z0-9_]
+    - Reemplaza cada secuencia de espacios/simbolos por "_"
+    - Mantiene solo [a-z0-9_], sin "_" al inicio ni al final
     """
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join(ch for ch in text if not unicodedata.combining(ch))
-    text = text.lower().strip()
-    text = "_".join(text.split())
-    text = "".join(ch for ch in text if ch.isalnum() or ch == "_")
-    return text
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return _SLUG_RE.sub("_", text.lower()).strip("_")
+
+
+def _create_pooled_connection() -> sqlite3.Connection:
+    """Abre una conexion para el pool, en modo autocommit, con filas sqlite3.Row y PRAGMAs de lectura rapida.
+
+    Con SQL_TRACE=1 (solo dev) imprime cada sentencia ejecutada.
+    """
+    conn = sqlite3.connect(
+        str(DB_PATH), check_same_thread=False, isolation_level=None, cached_statements=256
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    if os.getenv("SQL_TRACE") == "1":
+        conn.set_trace_callback(print)
+    return conn
+
+
+@contextmanager
+def _get_conn() -> Iterator[sqlite3.Connection]:
+    """Toma una conexion del pool (o crea una si esta vacio) y la devuelve al terminar.
+
+    El pool se llena de forma perezosa hasta POOL_SIZE conexiones; las que sobran se cierran.
+    """
+    try:
+        conn = _POOL.get_nowait()
+    except queue.Empty:
+        conn = _create_pooled_connection()
+
+    try:
+        yield conn
+    finally:
+        try:
+            _POOL.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def _close_pool() -> None:
+    """Cierra todas las conexiones del pool (se ejecuta en on_shutdown)."""
+    while True:
+        try:
+            _POOL.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+async def _init_redis(app: Litestar) -> None:
+    """Crea el cliente Redis en app.state.redis (None si REDIS_URL no esta definido).
+
+    El cliente usa un ConnectionPool compartido para no reconectar en cada request.
+    """
+    if not REDIS_URL:
+        app.state.redis = None
+        return
+
+    pool = ConnectionPool.from_url(REDIS_URL, decode_responses=True)
+    app.state.redis = Redis(connection_pool=pool)
+
+
+async def _close_redis(app: Litestar) -> None:
+    """Cierra el cliente Redis y su pool de conexiones al apagar la app."""
+    redis_client = app.state.get("redis")
+    if redis_client is not None:
+        await redis_client.aclose()
+        await redis_client.connection_pool.aclose()
 
 
 def init_db() -> None:
@@ -70,6 +237,10 @@ def init_db() -> None:
         """
     )
 
+    # Indice cubriente para el filtro por rol (supervisor): la consulta se resuelve solo con el indice.
+    # username ya tiene indice por UNIQUE e id es el rowid (PRIMARY KEY).
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_usuarios_rol ON usuarios (rol, id, nombre, renta_mensual)")
+
     if reset_db:
         cursor.execute("DELETE FROM usuarios")
         conn.commit()
@@ -82,32 +253,39 @@ def init_db() -> None:
         with open(DATA_PATH, "r", encoding="utf-8") as f:
             users_data = json.load(f)
 
-        for user in users_data:
-            base = _slugify(user["nombre"])
-            username = f"{base}_{user['id']}"
-
-            # Clave por defecto para todos: "password" (hasheada con bcrypt)
-            # Nota: bcrypt.gensalt() genera un salt aleatorio por usuario.
-            password_hash = bcrypt.hashpw(b"password", bcrypt.gensalt()).decode("utf-8")
-
-            cursor.execute(
-                """
-                INSERT INTO usuarios (id, nombre, rol, renta_mensual, username, password_hash)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    user["id"],
-                    user["nombre"],
-                    user["rol"],
-                    user["renta_mensual"],
-                    username,
-                    password_hash,
-                ),
+        # Clave por defecto para todos: "password" (hasheada con bcrypt)
+        # Se calcula un solo hash para todo el seed: cada hashpw cuesta ~250 ms,
+        # y al ser la misma clave de prueba no aporta generar un salt por usuario.
+        password_hash = bcrypt.hashpw(b"password", bcrypt.gensalt(BCRYPT_COST)).decode("utf-8")
+
+        rows = [
+            (
+                user["id"],
+                user["nombre"],
+                user["rol"],
+                user["renta_mensual"],
+                f"{_slugify(user['nombre'])}_{user['id']}",
+                password_hash,
             )
+            for user in users_data
+        ]
+
+        # Un solo INSERT preparado y una sola transaccion para todo el seed
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.executemany(
+            """
+            INSERT INTO usuarios (id, nombre, rol, renta_mensual, username, password_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
 
         conn.commit()
         print(f"DB poblada con {len(users_data)} usuarios")
 
+    # Estadisticas para el planificador de consultas de SQLite
+    cursor.execute("ANALYZE")
+    conn.commit()
     conn.close()
 
 
@@ -118,124 +296,313 @@ def _get_user_by_username(username: str) -> dict[str, Any] | None:
     - Esta funcion es interna al backend.
     - Nunca se debe retornar password_hash al frontend.
     """
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, nombre, rol, renta_mensual, username, password_hash FROM usuarios WHERE username = ?",
-        (username,),
-    )
-    row = cursor.fetchone()
-    conn.close()
+    with _get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(_SQL_GET_USER_AUTH, (username,))
+        row = cursor.fetchone()
 
     if not row:
         return None
 
-    return {
-        "id": row[0],
-        "nombre": row[1],
-        "rol": row[2],
-        "renta_mensual": row[3],
-        "username": row[4],
-        "password_hash": row[5],
-    }
+    return dict(row)
+
+
+def _auth_cache_key(username: str, password: str) -> tuple[str, bytes]:
+    """Construye la clave del cache de autenticacion sin guardar la clave en texto plano."""
+    digest = hmac.new(AUTH_CACHE_SECRET, f"{username}:{password}".encode("utf-8"), "sha256").digest()
+    return username, digest
+
+
+def _invalidate_auth_cache(user_id: int) -> None:
+    """Elimina del cache de autenticacion las entradas de un usuario (logout / cambio de clave)."""
+    with _AUTH_CACHE_LOCK:
+        for key in _AUTH_CACHE_KEYS.pop(user_id, ()):
+            _AUTH_CACHE.pop(key, None)
+
+
+def _needs_rehash(password_hash: str) -> bool:
+    """Indica si un hash bcrypt ($2b$<costo>$...) fue generado con un costo menor a BCRYPT_COST."""
+    return int(password_hash.split("$")[2]) < BCRYPT_COST
+
+
+def _rehash_password(user_id: int, password: str) -> None:
+    """Re-genera el hash con BCRYPT_COST y lo guarda (se llama tras un login exitoso)."""
+    password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(BCRYPT_COST)).decode("utf-8")
+    with _get_conn() as conn:
+        conn.execute(_SQL_UPDATE_PASSWORD_HASH, (password_hash, user_id))
+
+
+async def _authenticate_user(username: str, password: str) -> dict[str, Any] | None:
+    """Valida credenciales contra bcrypt y retorna el usuario (sin hash) si autentica.
 
+    Los logins exitosos se guardan en un cache en memoria (TTL de AUTH_CACHE_TTL segundos),
+    asi un re-login con las mismas credenciales no vuelve a pagar el costo de bcrypt.
+    Los intentos fallidos no se cachean. En un cache miss, bcrypt corre en _BCRYPT_POOL,
+    y si el hash guardado tiene un costo menor se re-genera con BCRYPT_COST (migracion perezosa).
+    """
+    key = _auth_cache_key(username, password)
+    with _AUTH_CACHE_LOCK:
+        cached = _AUTH_CACHE.get(key)
+    if cached is not None:
+        return dict(cached)
 
-def _authenticate_user(username: str, password: str) -> dict[str, Any] | None:
-    """Valida credenciales contra bcrypt y retorna el usuario (sin hash) si autentica."""
     user = _get_user_by_username(username)
     if not user:
         return None
 
-    ok = bcrypt.checkpw(password.encode("utf-8"), user["password_hash"].encode("utf-8"))
+    loop = asyncio.get_running_loop()
+    ok = await loop.run_in_executor(
+        _BCRYPT_POOL,
+        bcrypt.checkpw,
+        password.encode("utf-8"),
+        user["password_hash"].encode("utf-8"),
+    )
     if ok:
+        if _needs_rehash(user["password_hash"]):
+            await loop.run_in_executor(_BCRYPT_POOL, _rehash_password, user["id"], password)
+
         user.pop("password_hash", None)
+        with _AUTH_CACHE_LOCK:
+            _AUTH_CACHE[key] = dict(user)
+            # Se aprovecha para descartar del indice las claves que ya expiraron
+            keys = {k for k in _AUTH_CACHE_KEYS.get(user["id"], ()) if k in _AUTH_CACHE}
+            keys.add(key)
+            _AUTH_CACHE_KEYS[user["id"]] = keys
         return user
 
     return None
 
 
+def _load_users_snapshot() -> tuple[dict[str, list[dict[str, Any]]], dict[int, dict[str, Any]]]:
+    """Lee la tabla usuarios y arma el snapshot en memoria (si no existe uno vigente)."""
+    global _USERS_SNAPSHOT
+
+    with _USERS_SNAPSHOT_LOCK:
+        if _USERS_SNAPSHOT is not None:
+            return _USERS_SNAPSHOT
+
+        with _get_conn() as conn:
+            rows = [dict(r) for r in conn.execute(_SQL_GET_USERS_ALL)]
+
+        users_by_role = {
+            role: rows if visible is None else [r for r in rows if r["rol"] in visible]
+            for role, visible in _VISIBLE_ROLES.items()
+        }
+        user_by_id = {r["id"]: r for r in rows}
+        _USERS_SNAPSHOT = (users_by_role, user_by_id)
+        return _USERS_SNAPSHOT
+
+
+def _refresh_users_snapshot() -> None:
+    """Carga el snapshot al iniciar la app (despues de init_db)."""
+    _invalidate_users_snapshot()
+    _load_users_snapshot()
+
+
+def _invalidate_users_snapshot() -> None:
+    """Descarta el snapshot; se recarga en la siguiente lectura.
+
+    Debe llamarse en cualquier escritura futura sobre la tabla `usuarios`.
+    """
+    global _USERS_SNAPSHOT
+
+    with _USERS_SNAPSHOT_LOCK:
+        _USERS_SNAPSHOT = None
+
+
 def _get_users_for_role(current_user_id: int, current_role: str) -> list[dict[str, Any]]:
-    """Aplica reglas de visibilidad por rol y retorna la lista visible.
+    """Aplica reglas de visibilidad por rol y retorna la lista visible (desde el snapshot).
 
     Reglas:
     - admin: ve todos
     - supervisor: ve supervisor y usuario (no admin)
     - usuario: solo se ve a si mismo
     """
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
+    users_by_role, user_by_id = _USERS_SNAPSHOT or _load_users_snapshot()
 
-    if current_role == "admin":
-        cursor.execute("SELECT id, nombre, rol, renta_mensual FROM usuarios")
+    if current_role == "usuario":
+        user = user_by_id.get(current_user_id)
+        return [user] if user is not None else []
 
-    elif current_role == "supervisor":
-        cursor.execute(
-            "SELECT id, nombre, rol, renta_mensual FROM usuarios WHERE rol IN ('supervisor', 'usuario')"
-        )
+    # deny by default: rol desconocido => sin resultados
+    return users_by_role.get(current_role, [])
 
-    elif current_role == "usuario":
-        cursor.execute(
-            "SELECT id, nombre, rol, renta_mensual FROM usuarios WHERE id = ?",
-            (current_user_id,),
-        )
 
+def _parse_session_cookie(value: str | None) -> tuple[int, str, str] | None:
+    """Verifica la firma de la cookie "sid" y retorna (user_id, rol, token).
+
+    Retorna None si falta, tiene mal formato, la firma no es valida o expiro (SESSION_TTL).
+    """
+    if not value:
+        return None
+
+    try:
+        payload = _SESSION_SIGNER.unsign(value, max_age=SESSION_TTL).decode("utf-8")
+    except BadSignature:
+        return None
+
+    user_id, role, token = payload.split(":", 2)
+    return int(user_id), role, token
+
+
+async def _create_session(redis_client: Redis | None, user: dict[str, Any]) -> str:
+    """Crea una sesion para el usuario y retorna el valor (firmado) de la cookie "sid"."""
+    user_id = user["id"]
+    token = secrets.token_urlsafe(32)
+    key = f"sess:{user_id}:{token}"
+    session = {"user_id": str(user_id), "role": user["rol"]}
+    cookie = _SESSION_SIGNER.sign(f"{user_id}:{user['rol']}:{token}").decode("utf-8")
+
+    if redis_client is None:
+        with _LOCAL_SESSIONS_LOCK:
+            _LOCAL_SESSIONS[key] = session
+            keys = {k for k in _LOCAL_USER_SESSIONS.get(user_id, ()) if k in _LOCAL_SESSIONS}
+            keys.add(key)
+            _LOCAL_USER_SESSIONS[user_id] = keys
+        return cookie
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping=session)
+        pipe.expire(key, SESSION_TTL)
+        pipe.sadd(f"user_sessions:{user_id}", key)
+        pipe.expire(f"user_sessions:{user_id}", SESSION_TTL)
+        await pipe.execute()
+    return cookie
+
+
+async def _get_session(redis_client: Redis | None, cookie: str | None) -> dict[str, Any] | None:
+    """Retorna {"user_id", "role"} de la sesion, o None si no es valida o fue revocada.
+
+    user_id y rol salen de la cookie firmada; el store solo se consulta para saber
+    si la sesion sigue activa (EXISTS en Redis), sin leer ni reconstruir datos.
+    """
+    parsed = _parse_session_cookie(cookie)
+    if parsed is None:
+        return None
+
+    user_id, role, token = parsed
+    key = f"sess:{user_id}:{token}"
+
+    if redis_client is None:
+        with _LOCAL_SESSIONS_LOCK:
+            active = key in _LOCAL_SESSIONS
     else:
-        # deny by default: rol desconocido => sin resultados
-        cursor.execute("SELECT id, nombre, rol, renta_mensual FROM usuarios WHERE 1=0")
+        active = bool(await redis_client.exists(key))
 
-    rows = cursor.fetchall()
-    conn.close()
+    return {"user_id": user_id, "role": role} if active else None
+
+
+async def _delete_session(redis_client: Redis | None, cookie: str | None) -> int | None:
+    """Elimina una sesion en un solo viaje al store (no falla si ya no existe).
+
+    Retorna el user_id de la cookie, o None si la cookie no es valida.
+    """
+    parsed = _parse_session_cookie(cookie)
+    if parsed is None:
+        return None
+
+    user_id, _, token = parsed
+    key = f"sess:{user_id}:{token}"
+
+    if redis_client is None:
+        with _LOCAL_SESSIONS_LOCK:
+            _LOCAL_SESSIONS.pop(key, None)
+            _LOCAL_USER_SESSIONS.get(user_id, set()).discard(key)
+        return user_id
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.unlink(key)
+        pipe.srem(f"user_sessions:{user_id}", key)
+        await pipe.execute()
+    return user_id
+
+
+async def _load_session(request: Request) -> None:
+    """Hook before_request: deja la sesion verificada en request.state.session (o None)."""
+    request.state.session = await _get_session(
+        request.app.state.get("redis"), request.cookies.get(SESSION_COOKIE)
+    )
 
-    return [{"id": r[0], "nombre": r[1], "rol": r[2], "renta_mensual": r[3]} for r in rows]
+
+async def _invalidate_user(redis_client: Redis | None, user_id: int) -> None:
+    """Cierra todas las sesiones de un usuario y borra sus logins cacheados.
+
+    Pensado para futuros endpoints de cambio/reset de clave. Solo toca las claves
+    del usuario (sess:<user_id>:*, user_sessions:<user_id>), nunca el resto del cache.
+    """
+    _invalidate_auth_cache(user_id)
+
+    if redis_client is None:
+        with _LOCAL_SESSIONS_LOCK:
+            for key in _LOCAL_USER_SESSIONS.pop(user_id, ()):
+                _LOCAL_SESSIONS.pop(key, None)
+        return
+
+    index_key = f"user_sessions:{user_id}"
+    keys = await redis_client.smembers(index_key)
+    await redis_client.unlink(index_key, *keys)
 
 
 @post("/auth/login")
-async def login(request: Request) -> Response:
+async def login(request: Request, data: LoginDTO) -> Response:
     """Endpoint de login.
 
-    Recibe JSON:
+    Recibe JSON (LoginDTO; si faltan campos o no son strings responde 400):
         {"username": "...", "password": "..."}
 
-    Si autentica, setea cookies HTTPOnly:
-    - user_id: id del usuario autenticado
-    - role: rol del usuario autenticado
+    Si autentica, crea una sesion del lado del servidor y setea la cookie HTTPOnly
+    "sid" con "<user_id>:<rol>:<token>" firmado: el rol viaja en la cookie, pero
+    cualquier edicion del cliente invalida la firma.
     """
-    data = await request.json()
-    username = (data.get("username") or "").strip()
-    password = data.get("password") or ""
-
-    user = _authenticate_user(username, password)
+    user = await _authenticate_user(data.username, data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Credenciales invalidas")
 
-    response = Response(content={"message": "Login OK", "user": user})
-
-    # Cookies para mantener sesion durante la navegacion
-    # Nota: en produccion conviene setear secure=True y considerar expiracion.
-    response.set_cookie("user_id", str(user["id"]), httponly=True, samesite="lax")
-    response.set_cookie("role", user["rol"], httponly=True, samesite="lax")
+    sid = await _create_session(request.app.state.get("redis"), user)
+    response = ORJSONResponse(content={"message": "Login OK", "user": user})
+
+    # Cookie de sesion; en produccion (HTTPS) definir COOKIE_SECURE=1
+    response.set_cookie(
+        SESSION_COOKIE,
+        sid,
+        max_age=SESSION_TTL,
+        httponly=True,
+        secure=COOKIE_SECURE,
+        samesite="lax",
+    )
     return response
 
 
 @post("/auth/logout")
 async def logout(request: Request) -> Response:
-    """Endpoint de logout: elimina cookies de sesion."""
-    response = Response(content={"message": "Logout OK"})
-    response.delete_cookie("user_id")
-    response.delete_cookie("role")
+    """Endpoint de logout: elimina la sesion, su cookie y el login cacheado del usuario.
+
+    Es idempotente: sin cookie responde OK sin tocar el store, y una sesion ya
+    cerrada o expirada simplemente se vuelve a borrar.
+    """
+    response = ORJSONResponse(content={"message": "Logout OK"})
+    cookie = request.cookies.get(SESSION_COOKIE)
+    if not cookie:
+        return response
+
+    # Solo se cierra esta sesion; las de otros dispositivos siguen activas.
+    # No se verifica antes si existe: el borrado ya es un unico viaje al store.
+    user_id = await _delete_session(request.app.state.get("redis"), cookie)
+    if user_id is not None:
+        _invalidate_auth_cache(user_id)
+
+    response.set_cookie(SESSION_COOKIE, "", max_age=0, httponly=True, secure=COOKIE_SECURE, samesite="lax")
     return response
 
 
-@get("/usuarios")
+@get("/usuarios", before_request=_load_session)
 async def usuarios(request: Request) -> list[dict[str, Any]]:
-    """Retorna la lista de usuarios visibles segun el rol guardado en cookies."""
-    user_id_cookie = request.cookies.get("user_id")
-    role_cookie = request.cookies.get("role")
-
-    if not user_id_cookie or not role_cookie:
+    """Retorna la lista de usuarios visibles segun el rol guardado en la sesion."""
+    session = request.state.session
+    if session is None:
         raise HTTPException(status_code=401, detail="No autenticado")
 
-    return _get_users_for_role(int(user_id_cookie), role_cookie)
+    return _get_users_for_role(session["user_id"], session["role"])
 
 
 # Router para servir el frontend (HTML/CSS/JS)
@@ -246,7 +613,12 @@ static_router = create_static_files_router(
 )
 
 # API primero, estaticos al final
-app = Litestar(route_handlers=[login, logout, usuarios, static_router], on_startup=[init_db])
+app = Litestar(
+    route_handlers=[login, logout, usuarios, static_router],
+    response_class=ORJSONResponse,
+    on_startup=[init_db, _refresh_users_snapshot, _init_redis],
+    on_shutdown=[_close_pool, _close_redis],
+)
 
 if __name__ == "__main__":
     import uvicorn
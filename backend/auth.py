@@ -1,11 +1,31 @@
+import hmac
+import os
+import secrets
+import threading
+
 import bcrypt
-import models
+from cachetools import TTLCache
 from typing import Any
 
+from . import models
+
+
+# Costo de bcrypt para hashes nuevos; los guardados con un costo menor se re-generan al autenticar.
+BCRYPT_COST = int(os.getenv("BCRYPT_COST", "12"))
+
+# Cache en memoria de logins verificados: (username, HMAC-SHA256) -> usuario sin hash.
+# Nunca se guarda la clave en texto plano ni se persiste a disco.
+# _AUTH_CACHE_KEYS indexa las claves por user_id para invalidar un usuario en O(1).
+AUTH_CACHE_SECRET = os.getenv("AUTH_CACHE_SECRET", "").encode("utf-8") or secrets.token_bytes(32)
+AUTH_CACHE_TTL = 300
+_AUTH_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+_AUTH_CACHE_KEYS: dict[int, set[tuple[str, bytes]]] = {}
+_AUTH_CACHE_LOCK = threading.Lock()
+
 
 def hash_password(password: str) -> bytes:
-    """Genera un hash bcrypt para una clave en texto plano."""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    """Genera un hash bcrypt (costo BCRYPT_COST) para una clave en texto plano."""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(BCRYPT_COST))
 
 
 def verify_password(password: str, hashed: str) -> bool:
@@ -13,15 +33,53 @@ def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
 
 
+def needs_rehash(hashed: str) -> bool:
+    """Indica si un hash bcrypt ($2b$<costo>$...) tiene un costo menor a BCRYPT_COST."""
+    return int(hashed.split("$")[2]) < BCRYPT_COST
+
+
+def _auth_cache_key(username: str, password: str) -> tuple[str, bytes]:
+    """Clave del cache de autenticacion (no contiene la clave en texto plano)."""
+    digest = hmac.new(AUTH_CACHE_SECRET, f"{username}:{password}".encode("utf-8"), "sha256").digest()
+    return username, digest
+
+
+def invalidate_auth_cache(user_id: int) -> None:
+    """Elimina los logins cacheados de un usuario (usar en logout o cambio de clave)."""
+    with _AUTH_CACHE_LOCK:
+        for key in _AUTH_CACHE_KEYS.pop(user_id, ()):
+            _AUTH_CACHE.pop(key, None)
+
+
 def authenticate_user(username: str, password: str) -> dict[str, Any] | None:
-    """Autentica credenciales y retorna usuario sin password_hash si son validas."""
+    """Autentica credenciales y retorna usuario sin password_hash si son validas.
+
+    Los logins exitosos se cachean en memoria por AUTH_CACHE_TTL segundos para no
+    repetir bcrypt en cada intento. Si el hash guardado tiene un costo menor, se re-genera
+    con BCRYPT_COST y se actualiza en la base (migracion perezosa).
+    """
+    key = _auth_cache_key(username, password)
+    with _AUTH_CACHE_LOCK:
+        cached = _AUTH_CACHE.get(key)
+    if cached is not None:
+        return dict(cached)
+
     user = models.get_user_auth_by_username(username)
 
     if not user:
         return None
 
     if verify_password(password, user["password_hash"]):
+        if needs_rehash(user["password_hash"]):
+            models.update_password_hash(user["id"], hash_password(password).decode("utf-8"))
+
         user.pop("password_hash", None)
+        with _AUTH_CACHE_LOCK:
+            _AUTH_CACHE[key] = dict(user)
+            # Se aprovecha para descartar del indice las claves que ya expiraron
+            keys = {k for k in _AUTH_CACHE_KEYS.get(user["id"], ()) if k in _AUTH_CACHE}
+            keys.add(key)
+            _AUTH_CACHE_KEYS[user["id"]] = keys
         return user
 
     return None
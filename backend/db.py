@@ -1,6 +1,12 @@
 import json
+import os
+import queue
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
+
+import bcrypt
 
 
 # Base del archivo actual (backend/db.py) y raiz del repo
@@ -8,15 +14,23 @@ BASE_DIR = Path(__file__).resolve().parent
 PROJECT_DIR = BASE_DIR.parent
 
 # Rutas del proyecto:
-# - DB_PATH: base de datos SQLite en la raiz del repo
+# - DB_PATH: base de datos SQLite en la raiz del repo (o la variable de entorno DB_PATH)
 # - DATA_PATH: archivo JSON con los usuarios de prueba
-DB_PATH = PROJECT_DIR / "prueba.db"
+DB_PATH = Path(os.getenv("DB_PATH") or PROJECT_DIR / "prueba.db")
 DATA_PATH = PROJECT_DIR / "data" / "usuarios.json"
 
-# Hash bcrypt fijo para entorno de prueba: corresponde a la clave "password"
+# Costo de bcrypt (12 por defecto). En tests/CI se puede bajar con BCRYPT_COST=4.
+BCRYPT_COST = int(os.getenv("BCRYPT_COST", "12"))
+
+# Hash bcrypt fijo (costo 12) para entorno de prueba: corresponde a la clave "password".
+# Con otro BCRYPT_COST, init_db genera el hash al momento de seedear.
 # Nota: en produccion, cada usuario deberia tener su propio hash generado al registrar.
 TEST_PASSWORD_HASH = "$2b$12$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi"
 
+# Pool de conexiones compartidas para las consultas de lectura (models.py).
+POOL_SIZE = min(32, (os.cpu_count() or 1) * 4)
+_POOL: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=POOL_SIZE)
+
 
 def create_connection() -> sqlite3.Connection:
     """Crea y retorna una conexion a la base de datos SQLite.
@@ -27,11 +41,72 @@ def create_connection() -> sqlite3.Connection:
     return sqlite3.connect(str(DB_PATH))
 
 
+def create_pooled_connection() -> sqlite3.Connection:
+    """Crea una conexion pensada para el pool.
+
+    - check_same_thread=False: la conexion puede pasar entre hilos del servidor.
+    - isolation_level=None: modo autocommit (solo se usa para lecturas).
+    - cached_statements=256: cache de statements compilados mas grande que el default (128).
+    - row_factory=sqlite3.Row: las filas se convierten a dict con dict(row).
+    - PRAGMAs: WAL, synchronous=NORMAL y cache de paginas de ~20 MB.
+    - SQL_TRACE=1 (solo dev): imprime cada sentencia ejecutada.
+
+    Returns:
+        sqlite3.Connection: Conexion configurada.
+    """
+    conn = sqlite3.connect(
+        str(DB_PATH), check_same_thread=False, isolation_level=None, cached_statements=256
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    if os.getenv("SQL_TRACE") == "1":
+        conn.set_trace_callback(print)
+    return conn
+
+
+@contextmanager
+def get_conn() -> Iterator[sqlite3.Connection]:
+    """Presta una conexion del pool y la devuelve al salir del bloque `with`.
+
+    Si el pool esta vacio se crea una conexion nueva; si al devolverla el pool
+    ya tiene POOL_SIZE conexiones, la conexion sobrante se cierra.
+
+    Yields:
+        sqlite3.Connection: Conexion lista para usar.
+    """
+    try:
+        conn = _POOL.get_nowait()
+    except queue.Empty:
+        conn = create_pooled_connection()
+
+    try:
+        yield conn
+    finally:
+        try:
+            _POOL.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def close_pool() -> None:
+    """Cierra todas las conexiones que quedan en el pool."""
+    while True:
+        try:
+            _POOL.get_nowait().close()
+        except queue.Empty:
+            break
+
+
 def create_table(conn: sqlite3.Connection) -> None:
     """Crea la tabla `usuarios` si no existe.
 
     La tabla guarda informacion basica del usuario y credenciales (hash).
-    Se usa `username` como unico para evitar duplicados.
+    Se usa `username` como unico para evitar duplicados (y queda indexado).
+    Ademas se crea un indice cubriente por rol para el filtro del supervisor;
+    las busquedas por `id` usan el rowid (PRIMARY KEY) y no necesitan indice.
 
     Args:
         conn (sqlite3.Connection): Conexion a la base de datos.
@@ -49,6 +124,7 @@ def create_table(conn: sqlite3.Connection) -> None:
         )
         """
     )
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_usuarios_rol ON usuarios (rol, id, nombre, renta_mensual)")
     conn.commit()
 
 
@@ -58,12 +134,15 @@ def init_db() -> None:
     Flujo:
     1) Crea la conexion.
     2) Asegura la existencia de la tabla `usuarios`.
-    3) Si la tabla esta vacia, carga datos desde usuarios.json e inserta registros.
-    4) Cierra la conexion.
+    3) Si la tabla esta vacia, carga datos desde usuarios.json e inserta los registros
+       con un solo executemany dentro de una transaccion.
+    4) Ejecuta ANALYZE para que el planificador tenga estadisticas.
+    5) Cierra la conexion.
 
     Notas:
     - El username se genera a partir del nombre + id para que sea deterministico.
-    - Se inserta un password_hash fijo (bcrypt) para pruebas, clave: "password".
+    - Se inserta un password_hash (bcrypt) para pruebas, clave: "password":
+      el fijo TEST_PASSWORD_HASH, o uno generado si BCRYPT_COST no es 12.
     """
     conn = create_connection()
     try:
@@ -79,28 +158,42 @@ def init_db() -> None:
             with open(DATA_PATH, "r", encoding="utf-8") as f:
                 users_data = json.load(f)
 
-            for user in users_data:
-                # Normaliza el nombre para construir el username
-                # Ejemplo: "Juan Perez" + id 2 => "juan_perez_2"
-                username = f"{user['nombre'].lower().replace(' ', '_')}_{user['id']}"
-
-                cursor.execute(
-                    """
-                    INSERT INTO usuarios (id, nombre, rol, renta_mensual, username, password_hash)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        user["id"],
-                        user["nombre"],
-                        user["rol"],
-                        user["renta_mensual"],
-                        username,
-                        TEST_PASSWORD_HASH,
-                    ),
+            # Solo se paga bcrypt si hay que seedear y el costo no es el del hash fijo
+            if BCRYPT_COST == 12:
+                password_hash = TEST_PASSWORD_HASH
+            else:
+                password_hash = bcrypt.hashpw(b"password", bcrypt.gensalt(BCRYPT_COST)).decode("utf-8")
+
+            # Normaliza el nombre para construir el username
+            # Ejemplo: "Juan Perez" + id 2 => "juan_perez_2"
+            rows = [
+                (
+                    user["id"],
+                    user["nombre"],
+                    user["rol"],
+                    user["renta_mensual"],
+                    f"{user['nombre'].lower().replace(' ', '_')}_{user['id']}",
+                    password_hash,
                 )
+                for user in users_data
+            ]
+
+            # Un solo INSERT preparado y una sola transaccion para todo el seed
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(
+                """
+                INSERT INTO usuarios (id, nombre, rol, renta_mensual, username, password_hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
 
             conn.commit()
             print(f"DB poblada con {len(users_data)} usuarios")
+
+        # Estadisticas para el planificador de consultas de SQLite
+        cursor.execute("ANALYZE")
+        conn.commit()
     finally:
         # Se asegura el cierre de la conexion aunque ocurra un error
         conn.close()
@@ -1,7 +1,26 @@
-import sqlite3
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
-from .db import DB_PATH
+from .db import get_conn
+
+
+# SQL como constantes de modulo: el texto identico permite que cada conexion del pool
+# reutilice el statement ya compilado (cache de sqlite3, ver cached_statements en db.py).
+_SQL_GET_USER = "SELECT id, nombre, rol, renta_mensual, username FROM usuarios WHERE username = ?"
+_SQL_GET_USER_AUTH = "SELECT id, nombre, rol, renta_mensual, username, password_hash FROM usuarios WHERE username = ?"
+_SQL_GET_USERS_ADMIN = "SELECT id, nombre, rol, renta_mensual FROM usuarios"
+_SQL_GET_USERS_SUPERVISOR = "SELECT id, nombre, rol, renta_mensual FROM usuarios WHERE rol IN ('supervisor', 'usuario')"
+_SQL_GET_USERS_SELF = "SELECT id, nombre, rol, renta_mensual FROM usuarios WHERE id = ?"
+_SQL_GET_USERS_NONE = "SELECT id, nombre, rol, renta_mensual FROM usuarios WHERE 1=0"
+_SQL_UPDATE_PASSWORD_HASH = "UPDATE usuarios SET password_hash = ? WHERE id = ?"
+
+# Reglas de visibilidad: rol -> (SQL, funcion que arma los parametros a partir del user_id).
+# Un rol que no esta en el dict usa _VISIBILITY_DENY (deny by default).
+_VISIBILITY: Dict[str, Tuple[str, Callable[[int], tuple]]] = {
+    "admin": (_SQL_GET_USERS_ADMIN, lambda user_id: ()),
+    "supervisor": (_SQL_GET_USERS_SUPERVISOR, lambda user_id: ()),
+    "usuario": (_SQL_GET_USERS_SELF, lambda user_id: (user_id,)),
+}
+_VISIBILITY_DENY: Tuple[str, Callable[[int], tuple]] = (_SQL_GET_USERS_NONE, lambda user_id: ())
 
 
 def get_user_by_username(username: str) -> Optional[Dict]:
@@ -16,24 +35,15 @@ def get_user_by_username(username: str) -> Optional[Dict]:
     Returns:
         Optional[Dict]: Datos del usuario si existe, o None si no existe.
     """
-    conn = sqlite3.connect(DB_PATH)
-    try:
+    with get_conn() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT id, nombre, rol, renta_mensual, username FROM usuarios WHERE username = ?", (username,))
+        cursor.execute(_SQL_GET_USER, (username,))
         row = cursor.fetchone()
-    finally:
-        conn.close()
 
     if not row:
         return None
 
-    return {
-        "id": row[0],
-        "nombre": row[1],
-        "rol": row[2],
-        "renta_mensual": row[3],
-        "username": row[4],
-    }
+    return dict(row)
 
 
 def get_user_auth_by_username(username: str) -> Optional[Dict]:
@@ -47,28 +57,15 @@ def get_user_auth_by_username(username: str) -> Optional[Dict]:
     Returns:
         Optional[Dict]: Datos del usuario con password_hash si existe, o None si no existe.
     """
-    conn = sqlite3.connect(DB_PATH)
-    try:
+    with get_conn() as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id, nombre, rol, renta_mensual, username, password_hash FROM usuarios WHERE username = ?",
-            (username,),
-        )
+        cursor.execute(_SQL_GET_USER_AUTH, (username,))
         row = cursor.fetchone()
-    finally:
-        conn.close()
 
     if not row:
         return None
 
-    return {
-        "id": row[0],
-        "nombre": row[1],
-        "rol": row[2],
-        "renta_mensual": row[3],
-        "username": row[4],
-        "password_hash": row[5],
-    }
+    return dict(row)
 
 
 def get_users_for_role(current_user_id: int, current_role: str) -> List[Dict]:
@@ -86,38 +83,20 @@ def get_users_for_role(current_user_id: int, current_role: str) -> List[Dict]:
     Returns:
         List[Dict]: Lista de registros visibles con id, nombre, rol, renta_mensual.
     """
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        cursor = conn.cursor()
+    sql, params = _VISIBILITY.get(current_role, _VISIBILITY_DENY)
+
+    with get_conn() as conn:
+        rows = conn.execute(sql, params(current_user_id)).fetchall()
 
-        if current_role == "admin":
-            cursor.execute("SELECT id, nombre, rol, renta_mensual FROM usuarios")
-
-        elif current_role == "supervisor":
-            cursor.execute(
-                """
-                SELECT id, nombre, rol, renta_mensual
-                FROM usuarios
-                WHERE rol IN ('supervisor', 'usuario')
-                """
-            )
-
-        elif current_role == "usuario":
-            cursor.execute(
-                """
-                SELECT id, nombre, rol, renta_mensual
-                FROM usuarios
-                WHERE id = ?
-                """,
-                (current_user_id,),
-            )
-
-        else:
-            # deny by default: rol desconocido => sin resultados
-            cursor.execute("SELECT id, nombre, rol, renta_mensual FROM usuarios WHERE 1=0")
-
-        rows = cursor.fetchall()
-    finally:
-        conn.close()
-
-    return [{"id": r[0], "nombre": r[1], "rol": r[2], "renta_mensual": r[3]} for r in rows]
+    return [dict(r) for r in rows]
+
+
+def update_password_hash(user_id: int, password_hash: str) -> None:
+    """Reemplaza el password_hash de un usuario (por ejemplo, al re-hashear con otro costo).
+
+    Args:
+        user_id (int): ID del usuario.
+        password_hash (str): Nuevo hash bcrypt.
+    """
+    with get_conn() as conn:
+        conn.execute(_SQL_UPDATE_PASSWORD_HASH, (password_hash, user_id))
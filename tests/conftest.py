@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# Se define antes de importar la app:
+# - bcrypt al minimo (costo 4) para que el seed y los logins sean rapidos.
+# - base SQLite temporal, para no tocar prueba.db de la raiz del repo.
+os.environ.setdefault("BCRYPT_COST", "4")
+
+_TMP_DIR = tempfile.mkdtemp(prefix="prueba_tests_")
+atexit.register(shutil.rmtree, _TMP_DIR, ignore_errors=True)
+os.environ.setdefault("DB_PATH", os.path.join(_TMP_DIR, "prueba.db"))
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
 import pytest
-from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN
+from litestar.status_codes import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_403_FORBIDDEN,
+)
 
 try:
     from litestar.testing import TestClient
@@ -37,3 +43,132 @@ def test_login_bad_password_returns_401_or_403() -> None:
             json={"username": "jhon_doe_1", "password": "mala"},
         )
         assert r.status_code in (HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN)
+
+
+@pytest.mark.skipif(TestClient is None, reason="Litestar TestClient no disponible")
+def test_login_missing_or_invalid_fields_returns_400() -> None:
+    from backend.app import app
+
+    # LoginDTO valida el body: campos faltantes o que no son strings => 400
+    with TestClient(app=app) as client:
+        for body in ({"username": "jhon_doe_1"}, {"username": "jhon_doe_1", "password": 123}, {}):
+            r = client.post("/auth/login", json=body)
+            assert r.status_code == HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.skipif(TestClient is None, reason="Litestar TestClient no disponible")
+def test_logout_invalidates_cached_login() -> None:
+    from backend.app import _AUTH_CACHE, _auth_cache_key, app
+
+    key = _auth_cache_key("jhon_doe_1", "password")
+
+    with TestClient(app=app) as client:
+        r = client.post("/auth/login", json={"username": "jhon_doe_1", "password": "password"})
+        assert r.status_code in (HTTP_200_OK, HTTP_201_CREATED)
+        assert key in _AUTH_CACHE
+
+        # Un segundo login con las mismas credenciales se resuelve desde el cache
+        r2 = client.post("/auth/login", json={"username": "jhon_doe_1", "password": "password"})
+        assert r2.status_code in (HTTP_200_OK, HTTP_201_CREATED)
+
+        client.post("/auth/logout")
+        assert key not in _AUTH_CACHE
+
+
+@pytest.mark.skipif(TestClient is None, reason="Litestar TestClient no disponible")
+def test_invalidate_user_closes_all_sessions_of_that_user() -> None:
+    import asyncio
+
+    from backend.app import _invalidate_user, app
+
+    with TestClient(app=app) as client1, TestClient(app=app) as client2, TestClient(app=app) as other:
+        for client, username in ((client1, "jhon_doe_1"), (client2, "jhon_doe_1"), (other, "ana_torres_3")):
+            r = client.post("/auth/login", json={"username": username, "password": "password"})
+            assert r.status_code in (HTTP_200_OK, HTTP_201_CREATED)
+
+        asyncio.run(_invalidate_user(app.state.get("redis"), 1))
+
+        assert client1.get("/usuarios").status_code == HTTP_401_UNAUTHORIZED
+        assert client2.get("/usuarios").status_code == HTTP_401_UNAUTHORIZED
+        # Las sesiones de otros usuarios no se ven afectadas
+        assert other.get("/usuarios").status_code == HTTP_200_OK
+
+
+def test_backend_never_flushes_whole_redis_db() -> None:
+    from pathlib import Path
+
+    # La invalidacion es por usuario; FLUSHDB/FLUSHALL borraria sesiones de todos
+    backend_dir = Path(__file__).resolve().parent.parent / "backend"
+    for path in backend_dir.rglob("*.py"):
+        source = path.read_text(encoding="utf-8").lower()
+        assert "flushdb(" not in source and "flushall(" not in source, path
+
+
+@pytest.mark.skipif(TestClient is None, reason="Litestar TestClient no disponible")
+def test_logout_is_idempotent() -> None:
+    from backend.app import app
+
+    with TestClient(app=app) as client:
+        # Sin sesion: responde OK y no setea cookies
+        r = client.post("/auth/logout")
+        assert r.status_code in (HTTP_200_OK, HTTP_201_CREATED)
+        assert r.headers.get("set-cookie") is None
+
+        client.post("/auth/login", json={"username": "jhon_doe_1", "password": "password"})
+        sid = client.cookies.get("sid")
+        assert client.post("/auth/logout").status_code in (HTTP_200_OK, HTTP_201_CREATED)
+
+        # Repetir el logout con la misma cookie (ya revocada) tambien responde OK
+        client.cookies.set("sid", sid)
+        assert client.post("/auth/logout").status_code in (HTTP_200_OK, HTTP_201_CREATED)
+        assert client.get("/usuarios").status_code == HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.skipif(TestClient is None, reason="Litestar TestClient no disponible")
+def test_login_rehashes_only_to_a_higher_cost(monkeypatch: pytest.MonkeyPatch) -> None:
+    import backend.app as backend_app
+
+    def stored_cost() -> str:
+        user = backend_app._get_user_by_username("luis_gomez_4")
+        assert user is not None
+        return user["password_hash"][:7]
+
+    def login(client: TestClient) -> None:
+        # Se limpia el cache de logins para forzar la verificacion con bcrypt
+        backend_app._invalidate_auth_cache(4)
+        r = client.post("/auth/login", json={"username": "luis_gomez_4", "password": "password"})
+        assert r.status_code in (HTTP_200_OK, HTTP_201_CREATED)
+
+    with TestClient(app=backend_app.app) as client:
+        # Hash de costo 4 (el del seed de tests) con BCRYPT_COST=5 => se sube a costo 5
+        backend_app._rehash_password(4, "password")
+        assert stored_cost() == "$2b$04$"
+        monkeypatch.setattr(backend_app, "BCRYPT_COST", 5)
+        login(client)
+        assert stored_cost() == "$2b$05$"
+
+        # Con un BCRYPT_COST menor el hash existente no se debilita
+        monkeypatch.setattr(backend_app, "BCRYPT_COST", 4)
+        assert not backend_app._needs_rehash("$2b$05$" + "x" * 53)
+        login(client)
+        assert stored_cost() == "$2b$05$"
+
+
+def test_auth_module_caches_and_invalidates_logins() -> None:
+    from backend import auth
+    from backend.app import init_db
+
+    init_db()
+    key = auth._auth_cache_key("jhon_doe_1", "password")
+
+    user = auth.authenticate_user("jhon_doe_1", "password")
+    assert user is not None and user["id"] == 1
+    assert "password_hash" not in user
+    assert key in auth._AUTH_CACHE
+    assert key in auth._AUTH_CACHE_KEYS[1]
+    assert auth.authenticate_user("jhon_doe_1", "mala") is None
+
+    # La invalidacion usa el indice por usuario (no recorre todo el cache)
+    auth.invalidate_auth_cache(1)
+    assert key not in auth._AUTH_CACHE
+    assert 1 not in auth._AUTH_CACHE_KEYS
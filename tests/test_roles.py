@@ -4,7 +4,7 @@ import re
 import unicodedata
 
 import pytest
-from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED
+from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED, HTTP_401_UNAUTHORIZED
 
 try:
     from litestar.testing import TestClient
@@ -67,3 +67,58 @@ def test_user_sees_only_self_or_subset() -> None:
         for item in visibles:
             assert isinstance(item, dict)
             assert int(item.get("id")) == int(candidato_id)
+
+
+@pytest.mark.skipif(TestClient is None, reason="Litestar TestClient no disponible")
+def test_forged_role_cookie_is_rejected() -> None:
+    from backend.app import app
+
+    # Sin sesion valida, cookies user_id/role editadas por el cliente no dan acceso
+    with TestClient(app=app) as client:
+        client.cookies.set("user_id", "1")
+        client.cookies.set("role", "admin")
+        r = client.get("/usuarios")
+        assert r.status_code == HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.skipif(TestClient is None, reason="Litestar TestClient no disponible")
+def test_tampered_session_cookie_is_rejected() -> None:
+    from backend.app import app
+
+    with TestClient(app=app) as client:
+        r = client.post("/auth/login", json={"username": "valentina_rios_11", "password": "password"})
+        assert r.status_code in (HTTP_200_OK, HTTP_201_CREATED)
+
+        # La cookie firmada lleva el rol; editarlo invalida la firma
+        sid = client.cookies.get("sid")
+        assert sid is not None and ":usuario:" in sid
+        client.cookies.set("sid", sid.replace(":usuario:", ":admin:"))
+        r2 = client.get("/usuarios")
+        assert r2.status_code == HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.skipif(TestClient is None, reason="Litestar TestClient no disponible")
+def test_usuarios_reloads_snapshot_after_invalidation() -> None:
+    import backend.app as backend_app
+
+    def nombre_de(users: list, user_id: int) -> str:
+        return next(u["nombre"] for u in users if u["id"] == user_id)
+
+    with TestClient(app=backend_app.app) as client:
+        r = client.post("/auth/login", json={"username": "jhon_doe_1", "password": "password"})
+        assert r.status_code in (HTTP_200_OK, HTTP_201_CREATED)
+        original = nombre_de(client.get("/usuarios").json(), 20)
+
+        try:
+            with backend_app._get_conn() as conn:
+                conn.execute("UPDATE usuarios SET nombre = ? WHERE id = 20", ("Nombre Editado",))
+
+            # Sin invalidar, /usuarios sigue respondiendo desde el snapshot
+            assert nombre_de(client.get("/usuarios").json(), 20) == original
+
+            backend_app._invalidate_users_snapshot()
+            assert nombre_de(client.get("/usuarios").json(), 20) == "Nombre Editado"
+        finally:
+            with backend_app._get_conn() as conn:
+                conn.execute("UPDATE usuarios SET nombre = ? WHERE id = 20", (original,))
+            backend_app._invalidate_users_snapshot()